@@ -1,9 +1,35 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, ForeignKey, Index, Uuid, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, relationship
 from datetime import datetime
+import os
+import uuid
 
-Base = declarative_base()
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./prepwise.db")
+# Async drivers: aiosqlite for SQLite, asyncpg for Postgres
+ASYNC_DATABASE_URL = (DATABASE_URL
+                      .replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+                      .replace("postgresql://", "postgresql+asyncpg://", 1))
+
+# Pooled, pre-pinged connections; SQLite manages its own pool sizing
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    **({} if ASYNC_DATABASE_URL.startswith("sqlite") else {"pool_size": 20, "max_overflow": 10}),
+)
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+async def get_db():
+    """FastAPI dependency yielding an AsyncSession"""
+    async with async_session() as s:
+        yield s
+
+class Base(DeclarativeBase):
+    pass
+
+# Native JSON documents: JSONB (GIN-indexable) on Postgres, JSON text elsewhere
+JsonType = JSON().with_variant(JSONB(), "postgresql")
 
 class User(Base):
     __tablename__ = "users"
@@ -19,7 +45,7 @@ class User(Base):
 class InterviewSession(Base):
     __tablename__ = "interview_sessions"
     
-    id = Column(String(36), primary_key=True, index=True)  # UUID
+    id = Column(Uuid, primary_key=True, index=True, default=uuid.uuid4)
     user_id = Column(Integer, ForeignKey("users.id"))
     name = Column(String(100), nullable=False)
     job_description = Column(Text, nullable=False)
@@ -33,14 +59,14 @@ class InterviewSession(Base):
     
     # Relationships
     user = relationship("User", back_populates="interview_sessions")
-    questions = relationship("Question", back_populates="session")
-    responses = relationship("QuestionResponse", back_populates="session")
+    questions = relationship("Question", back_populates="session", lazy="selectin")
+    responses = relationship("QuestionResponse", back_populates="session", lazy="selectin")
 
 class Question(Base):
     __tablename__ = "questions"
     
-    id = Column(String(36), primary_key=True, index=True)
-    session_id = Column(String(36), ForeignKey("interview_sessions.id"))
+    id = Column(Uuid, primary_key=True, index=True, default=uuid.uuid4)
+    session_id = Column(Uuid, ForeignKey("interview_sessions.id"), index=True)
     question_text = Column(Text, nullable=False)
     question_type = Column(String(20))  # behavioral, technical, situational
     difficulty = Column(String(10), default="medium")
@@ -54,10 +80,11 @@ class Question(Base):
 
 class QuestionResponse(Base):
     __tablename__ = "question_responses"
+    __table_args__ = (Index("ix_qr_session_question", "session_id", "question_id"),)
     
-    id = Column(String(36), primary_key=True, index=True)
-    session_id = Column(String(36), ForeignKey("interview_sessions.id"))
-    question_id = Column(String(36), ForeignKey("questions.id"))
+    id = Column(Uuid, primary_key=True, index=True, default=uuid.uuid4)
+    session_id = Column(Uuid, ForeignKey("interview_sessions.id"), index=True)
+    question_id = Column(Uuid, ForeignKey("questions.id"), index=True)
     audio_file_path = Column(String(255), nullable=True)
     video_file_path = Column(String(255), nullable=True)
     transcript = Column(Text, nullable=True)
@@ -67,17 +94,17 @@ class QuestionResponse(Base):
     # Relationships
     session = relationship("InterviewSession", back_populates="responses")
     question = relationship("Question", back_populates="response")
-    speech_analysis = relationship("SpeechAnalysis", back_populates="response", uselist=False)
-    video_analysis = relationship("VideoAnalysis", back_populates="response", uselist=False)
+    speech_analysis = relationship("SpeechAnalysis", back_populates="response", uselist=False, lazy="selectin")
+    video_analysis = relationship("VideoAnalysis", back_populates="response", uselist=False, lazy="selectin")
 
 class SpeechAnalysis(Base):
     __tablename__ = "speech_analysis"
     
     id = Column(Integer, primary_key=True, index=True)
-    response_id = Column(String(36), ForeignKey("question_responses.id"))
+    response_id = Column(Uuid, ForeignKey("question_responses.id"), index=True)
     transcript = Column(Text)
     filler_words_count = Column(Integer, default=0)
-    filler_words_details = Column(Text)  # JSON
+    filler_words_details = Column(JsonType)
     speaking_pace = Column(String(20))  # slow, normal, fast
     clarity_score = Column(Float)
     pronunciation_score = Column(Float)
@@ -85,7 +112,7 @@ class SpeechAnalysis(Base):
     volume_level = Column(String(20))
     word_count = Column(Integer)
     words_per_minute = Column(Float)
-    pause_analysis = Column(Text)  # JSON
+    pause_analysis = Column(JsonType)
     analysis_timestamp = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -95,19 +122,19 @@ class VideoAnalysis(Base):
     __tablename__ = "video_analysis"
     
     id = Column(Integer, primary_key=True, index=True)
-    response_id = Column(String(36), ForeignKey("question_responses.id"))
+    response_id = Column(Uuid, ForeignKey("question_responses.id"), index=True)
     posture_score = Column(Float)
     posture_classification = Column(String(50))
     eye_contact_score = Column(Float)
     facial_expression = Column(String(50))
-    gesture_analysis = Column(Text)  # JSON
-    movement_analysis = Column(Text)  # JSON
+    gesture_analysis = Column(JsonType)
+    movement_analysis = Column(JsonType)
     confidence_level = Column(String(20))
     engagement_score = Column(Float)
     professionalism_score = Column(Float)
     fidgeting_detected = Column(Boolean, default=False)
     fidgeting_frequency = Column(Float)
-    frame_quality = Column(Text)  # JSON
+    frame_quality = Column(JsonType)
     analysis_timestamp = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -115,16 +142,19 @@ class VideoAnalysis(Base):
 
 class FeedbackReport(Base):
     __tablename__ = "feedback_reports"
+    __table_args__ = (
+        Index("ix_fb_recs_gin", "recommendations", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(36), ForeignKey("interview_sessions.id"))
+    session_id = Column(Uuid, ForeignKey("interview_sessions.id"), index=True)
     overall_score = Column(Integer)
     speech_score = Column(Float)
     video_score = Column(Float)
-    detailed_feedback = Column(Text)  # JSON
-    recommendations = Column(Text)  # JSON
-    strengths = Column(Text)  # JSON
-    improvement_areas = Column(Text)  # JSON
+    detailed_feedback = Column(JsonType)
+    recommendations = Column(JsonType)
+    strengths = Column(JsonType)
+    improvement_areas = Column(JsonType)
     generated_at = Column(DateTime, default=datetime.utcnow)
 
 class AnalysisLog(Base):
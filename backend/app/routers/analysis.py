@@ -1,43 +1,133 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Request
 from pydantic import BaseModel
 from typing import List, Optional
 import logging
 from datetime import datetime
-from fastapi.responses import JSONResponse
-from collections import defaultdict
-import tempfile, subprocess, os
-
-from app.services.speech_service import SpeechAnalysisService
-
-def _ffmpeg_decode_to_wav_16k(src_path: str, dst_path: str) -> None:
-    # High-quality resample with soxr + 16k mono PCM16 WAV
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+import asyncio, tempfile, subprocess, os, shutil, time, hashlib, re, bisect
+import orjson
+from collections import Counter
+from functools import partial
+from cachetools import TTLCache
+
+from app.services.speech_service import get_speech_service
+from app.services.session_store import get_store, EMPTY_SUMMARY
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Demuxers to name explicitly for piped input, so ffmpeg skips format probing on stdin
+_PIPE_DEMUXERS = {".webm": "webm", ".ogg": "ogg", ".wav": "wav"}
+# One ffmpeg per core; bursts of uploads queue here instead of oversubscribing the CPUs
+_FFMPEG_SEM = asyncio.Semaphore(os.cpu_count() or 2)
+# Responses to successfully transcribed uploads keyed by (session, upload content digest), so a
+# re-sent chunk is answered again without being decoded, transcribed or recorded a second time;
+# failures and fallbacks are never cached
+_analysis_by_digest = TTLCache(maxsize=256, ttl=10 * 60)
+# Per-process hit/miss tallies for the cache above, reported by /cache-stats
+_digest_cache_stats = Counter(hits=0, misses=0)
+
+# Last formatted timestamp and its 10 ms bucket, shared by requests landing in the same tick
+_ts_bucket, _ts_iso = -1, ""
+
+def _now_iso() -> str:
+    global _ts_bucket, _ts_iso
+    t = time.time()
+    bucket = int(t * 100)
+    if bucket != _ts_bucket:
+        _ts_bucket, _ts_iso = bucket, datetime.fromtimestamp(t).isoformat()
+    return _ts_iso
+
+async def _run_ffmpeg(src: str, upload: Optional[UploadFile] = None, input_format: Optional[str] = None) -> bytes:
+    # High-quality resample with soxr to raw 16k mono s16le PCM (no WAV container), written to stdout
     cmd = [
         "ffmpeg", "-y", "-loglevel", "error",
-        "-i", src_path,
+        *(("-f", input_format) if input_format else ()),
+        "-i", src,
         "-ac", "1",
         "-ar", "16000",
         "-sample_fmt", "s16",
         "-af", "aresample=resampler=soxr:precision=28",
-        "-f", "wav", dst_path
+        "-f", "s16le", "pipe:1"
     ]
-    subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    async with _FFMPEG_SEM:
+        return await _exec_ffmpeg(cmd, upload)
+
+async def _exec_ffmpeg(cmd: List[str], upload: Optional[UploadFile]) -> bytes:
+    # Runs as a child process so concurrent uploads don't block the event loop
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if upload else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+
+    async def feed():
+        # Stream the upload in bounded chunks instead of buffering it whole
+        try:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg exited early; its return code says why
+        finally:
+            proc.stdin.close()
+
+    pending = [proc.stdout.read(), proc.stderr.read()]
+    if upload:
+        pending.append(feed())
+    out, err, *_ = await asyncio.gather(*pending)
+    await proc.wait()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=out, stderr=err)
+    return out
+
+async def _ffmpeg_decode_to_pcm16_16k(audio: UploadFile, suffix: str) -> bytes:
+    try:
+        return await _run_ffmpeg("pipe:0", audio, _PIPE_DEMUXERS.get(suffix))
+    except subprocess.CalledProcessError as e:
+        # Containers like mp4/m4a need a seekable input; retry from a temp file
+        logger.warning("ffmpeg pipe decode failed, retrying from file: %s",
+                       (e.stderr or b"").decode("utf-8", errors="ignore"))
+    await audio.seek(0)
+    tmp_name = await asyncio.to_thread(_spool_to_tempfile, audio.file, suffix)
+    try:
+        return await _run_ffmpeg(tmp_name)
+    finally:
+        try: await asyncio.to_thread(os.unlink, tmp_name)
+        except OSError: pass
+
+def _digest_file(f) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for block in iter(partial(f.read, UPLOAD_CHUNK_SIZE), b""):
+        h.update(block)
+    f.seek(0)
+    return h.hexdigest()
+
+def _spool_to_tempfile(src, suffix: str) -> str:
+    # Creation, copy and close all happen in the worker thread
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as f:
+        shutil.copyfileobj(src, f, UPLOAD_CHUNK_SIZE)
+        return f.name
+
+_FILLER_WORDS = frozenset({"um", "uh", "like", "hmm", "uhh", "umm"})
+# Longest alternatives first so "umm" isn't cut short at "um"
+_FILLER_RE = re.compile(r"\b(?:" + "|".join(sorted(_FILLER_WORDS, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+
+def _count_fillers(text: str) -> Counter:
+    return Counter(m.lower() for m in _FILLER_RE.findall(text or ""))
 
-def _filler_count_from_text(text: str) -> int:
-    words = [w.strip(".,?!;:()[]\"'").lower() for w in (text or "").split()]
-    return sum(1 for w in words if w in ("um", "uh", "like"))
+# Upper bounds (inclusive, wpm) for each pace label
+_RATE_BINS = (110.0, 160.0)
+_RATE_LABELS = ("Too slow", "Good pace", "Too fast")
 
 def _speaking_rate_label(rate) -> str:
     try:
         r = float(rate)
     except Exception:
         return str(rate or "normal")
-    if r <= 110: return "Too slow"
-    if r <= 160: return "Good pace"
-    return "Too fast"
+    return _RATE_LABELS[bisect.bisect_left(_RATE_BINS, r)]
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
-speech_service = SpeechAnalysisService()
+speech_service = get_speech_service()
 
 class AnalysisRequest(BaseModel):
     session_id: str
@@ -60,29 +150,45 @@ class FeedbackReport(BaseModel):
     recommendations: List[str]
     detailed_metrics: dict
 
-analysis_results = {}
-session_summaries = defaultdict(lambda: {
-    "chunks": [], "total_words": 0, "total_duration": 0.0,
-    "filler": {"um": 0, "uh": 0, "like": 0},
-    "rates": [], "clarities": [], "confidences": []
-})
+store = get_store()
+
+# Placeholder posture timeline for the report until frame-level posture is wired in
+_SAMPLE_POSTURE_DATA = (
+    {"posture_class": "Good Posture"},
+    {"posture_class": "Nervous Expression"},
+    {"posture_class": "Confident Expression"},
+    {"posture_class": "Slouching"},
+    {"posture_class": "Good Posture"},
+)
+
+# Placeholder results for /audio and /video; shared across requests, so treat as read-only
+_MOCK_AUDIO_RESULTS = {
+    "transcript": "This is a sample transcript of the user's response...",
+    "filler_words": {"um": 2, "uh": 1, "like": 3},
+    "speaking_pace": "normal", "clarity_score": 85,
+    "volume_level": "appropriate", "pronunciation_issues": []
+}
+_MOCK_VIDEO_RESULTS = {
+    "posture_score": 78,
+    "posture_classification": "good",
+    "eye_contact_score": 82,
+    "gesture_analysis": { "appropriate_gestures": 85, "fidgeting_detected": False, "hand_position": "appropriate" },
+    "facial_expression": { "confidence_level": "moderate", "engagement_score": 88, "emotion_detected": "neutral" },
+    "movement_analysis": { "stability": "stable", "excessive_movement": False }
+}
 
 @router.post("/audio", response_model=AnalysisResponse)
 async def analyze_audio(request: AnalysisRequest):
     try:
-        speech_results = {
-            "transcript": "This is a sample transcript of the user's response...",
-            "filler_words": {"um": 2, "uh": 1, "like": 3},
-            "speaking_pace": "normal", "clarity_score": 85,
-            "volume_level": "appropriate", "pronunciation_issues": []
-        }
-        analysis_id = f"audio_{request.session_id}_{len(analysis_results)}"
-        response = AnalysisResponse(
+        analysis_id = await store.next_analysis_id("audio", request.session_id)
+        response = AnalysisResponse.model_construct(
             analysis_id=analysis_id, session_id=request.session_id, analysis_type="audio",
-            results=speech_results, confidence_score=0.92, timestamp=str(datetime.now())
+            results=_MOCK_AUDIO_RESULTS, confidence_score=0.92, timestamp=_now_iso()
         )
-        analysis_results[analysis_id] = response.dict()
-        return response
+        record = response.model_dump()
+        await store.add_analysis(record)
+        # Returning a Response bypasses response_model re-validation; the model stays for the OpenAPI schema
+        return ORJSONResponse(record)
     except Exception as e:
         logger.error(f"Audio analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Audio analysis failed: {str(e)}")
@@ -95,17 +201,18 @@ async def analyze_speech_file(
     mime: Optional[str] = Form(None),
     lang: Optional[str] = Form(None),
 ):
-    tmp_in = None
-    tmp_wav = None
     try:
         mt = (mime or audio.content_type or "").lower()
         logger.info("Received audio: %s (mime=%s) session=%s q=%s", audio.filename, mt, session_id, str(question_number))
 
-        if not getattr(speech_service, "initialized", False):
-            await speech_service.initialize()
-            speech_service.initialized = True
-
-        raw_bytes = await audio.read()
+        if audio.size == 0:
+            # Nothing recorded (muted mic); don't spawn ffmpeg or touch the session
+            return {
+                "ok": True, "status": "no_speech",
+                "session_id": session_id, "question_number": question_number,
+                "text": "", "analysis": {"filler_count": 0, "confidence": 1.0},
+                "timestamp": _now_iso()
+            }
 
         if   "wav"  in mt: suffix = ".wav"
         elif "ogg"  in mt: suffix = ".ogg"
@@ -113,20 +220,29 @@ async def analyze_speech_file(
         elif "mp4"  in mt or "mpeg" in mt or "m4a" in mt: suffix = ".m4a"
         else: suffix = os.path.splitext(audio.filename or "")[-1] or ".bin"
 
-        tmp_in = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-        tmp_in.write(raw_bytes); tmp_in.flush(); tmp_in.close()
-        tmp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav"); tmp_wav.close()
+        # A retried/duplicate upload is already in the session's analyses and summary:
+        # answer it as before without recording it twice
+        cache_key = (session_id, await asyncio.to_thread(_digest_file, audio.file))
+        cached = _analysis_by_digest.get(cache_key)
+        if cached is not None:
+            _digest_cache_stats["hits"] += 1
+            return cached
+        _digest_cache_stats["misses"] += 1
 
+        cacheable = False
         try:
-            _ffmpeg_decode_to_wav_16k(tmp_in.name, tmp_wav.name)
-            with open(tmp_wav.name, "rb") as f:
-                wav_bytes = f.read()
-            analysis_result = await speech_service.analyze_audio_chunk(wav_bytes, session_id)
+            pcm_bytes = await _ffmpeg_decode_to_pcm16_16k(audio, suffix)
+            analysis_result = await speech_service.analyze_audio_chunk(pcm_bytes, session_id)
+            # Only a real transcription is worth replaying; mock/no-speech results may be a
+            # transient Whisper failure, and a retry should get another attempt
+            cacheable = analysis_result.get("analysis_type") == "real_whisper_ai"
         except subprocess.CalledProcessError as e:
             detail = (e.stderr or b"").decode("utf-8", errors="ignore")
             logger.error("ffmpeg decode failed: %s", detail)
             try:
-                analysis_result = await speech_service.analyze_audio_chunk(raw_bytes, session_id)
+                # Hand over the spooled upload itself; the service streams it in a worker thread
+                await audio.seek(0)
+                analysis_result = await speech_service.analyze_audio_chunk(audio.file, session_id)
             except Exception:
                 return JSONResponse({
                     "ok": False, "error": "ffmpeg_decode_failed", "detail": detail,
@@ -139,9 +255,8 @@ async def analyze_speech_file(
                            or analysis_result.get("transcript")
                            or "").strip()
 
-        if transcript_text:
-            for w in transcript_text.split():
-                logger.debug("[session %s] word: %s", session_id, w)
+        if transcript_text and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[session %s] words: %s", session_id, transcript_text)
 
         perf = analysis_result.get("performance_metrics", {}) or {}
         aq   = analysis_result.get("audio_quality", {}) or {}
@@ -154,7 +269,7 @@ async def analyze_speech_file(
             int(breakdown.get("like", 0) or 0)
         )
         if filler_count == 0 and transcript_text:
-            filler_count = _filler_count_from_text(transcript_text)
+            filler_count = sum(_count_fillers(transcript_text).values())
 
         clarity_score = int(aq.get("clarity_score", 0) or 0)
         speaking_rate = aq.get("speaking_rate", 0) or 0
@@ -181,37 +296,38 @@ async def analyze_speech_file(
             "question_number": question_number,
         }
 
-        analysis_id = f"audio_{session_id}_{len(analysis_results)}"
-        record = AnalysisResponse(
-            analysis_id=analysis_id, session_id=session_id, analysis_type="audio",
-            results=normalized_results, confidence_score=confidence, timestamp=datetime.now().isoformat()
-        ).dict()
-        analysis_results[analysis_id] = record
-
-        words = len([w for w in (transcript_text or "").split() if w.strip()])
-        s = session_summaries[session_id]
-        s["chunks"].append({
-            "question_number": question_number, "text": transcript_text, "words": words,
-            "duration": duration, "confidence": confidence, "timestamp": record["timestamp"],
-        })
-        s["total_words"] += words
-        s["total_duration"] += duration
-        s["filler"]["um"]  += normalized_results["filler_words"]["um"]
-        s["filler"]["uh"]  += normalized_results["filler_words"]["uh"]
-        s["filler"]["like"]+= normalized_results["filler_words"]["like"]
-        if isinstance(speaking_rate, (int, float)): s["rates"].append(float(speaking_rate))
-        if isinstance(clarity_score,  (int, float)): s["clarities"].append(float(clarity_score))
-        s["confidences"].append(confidence)
+        analysis_id = await store.next_analysis_id("audio", session_id)
+        # Same shape as AnalysisResponse; every field is already typed above, so skip re-validation
+        record = {
+            "analysis_id": analysis_id, "session_id": session_id, "analysis_type": "audio",
+            "results": normalized_results, "confidence_score": confidence, "timestamp": _now_iso()
+        }
+        await store.add_analysis(record)
+
+        words = len(transcript_text.split())
+        await store.append_chunk(
+            session_id,
+            {
+                "question_number": question_number, "text": transcript_text, "words": words,
+                "duration": duration, "confidence": confidence, "timestamp": record["timestamp"],
+                "time_only": record["timestamp"][11:19],
+            },
+            normalized_results["filler_words"],
+            speaking_rate=speaking_rate, clarity_score=clarity_score, confidence=confidence,
+        )
 
         logger.info("Speech analysis stored for session %s (analysis_id=%s)", session_id, analysis_id)
 
-        return {
+        response = {
             "ok": True, "status": "success",
             "session_id": session_id, "question_number": question_number,
             "text": transcript_text,
             "analysis": {"filler_count": int(filler_count), "confidence": confidence},
             "timestamp": record["timestamp"]
         }
+        if cacheable:
+            _analysis_by_digest[cache_key] = response
+        return response
 
     except Exception as e:
         logger.error(f"Speech analysis error: {str(e)}")
@@ -220,15 +336,10 @@ async def analyze_speech_file(
             "session_id": session_id, "question_number": question_number,
             "text": "", "analysis": {"filler_count": 0, "confidence": 0.0},
         }, status_code=200)
-    finally:
-        for p in ((tmp_in.name if tmp_in else None), (tmp_wav.name if tmp_wav else None)):
-            if p:
-                try: os.unlink(p)
-                except: pass
 
 @router.get("/summary/{session_id}")
 async def get_realtime_summary(session_id: str):
-    s = session_summaries.get(session_id)
+    s = await store.get_summary(session_id)
     if not s:
         raise HTTPException(status_code=404, detail="No summary yet for session")
     combined_text = " ".join(ch["text"] for ch in s["chunks"] if ch["text"])
@@ -238,142 +349,157 @@ async def get_realtime_summary(session_id: str):
         "total_words": s["total_words"],
         "total_duration": s["total_duration"],
         "filler": s["filler"],
-        "chunks": s["chunks"],
+        "chunks": list(s["chunks"]),
     }
 
 @router.post("/video", response_model=AnalysisResponse)
 async def analyze_video(request: AnalysisRequest):
     try:
-        video_results = {
-            "posture_score": 78,
-            "posture_classification": "good",
-            "eye_contact_score": 82,
-            "gesture_analysis": { "appropriate_gestures": 85, "fidgeting_detected": False, "hand_position": "appropriate" },
-            "facial_expression": { "confidence_level": "moderate", "engagement_score": 88, "emotion_detected": "neutral" },
-            "movement_analysis": { "stability": "stable", "excessive_movement": False }
-        }
-        analysis_id = f"video_{request.session_id}_{len(analysis_results)}"
-        response = AnalysisResponse(
+        analysis_id = await store.next_analysis_id("video", request.session_id)
+        response = AnalysisResponse.model_construct(
             analysis_id=analysis_id,
             session_id=request.session_id,
             analysis_type="video",
-            results=video_results,
+            results=_MOCK_VIDEO_RESULTS,
             confidence_score=0.87,
-            timestamp=str(datetime.now())
+            timestamp=_now_iso()
         )
-        analysis_results[analysis_id] = response.dict()
-        return response
+        record = response.model_dump()
+        await store.add_analysis(record)
+        # Returning a Response bypasses response_model re-validation; the model stays for the OpenAPI schema
+        return ORJSONResponse(record)
     except Exception as e:
         logger.error(f"Video analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Video analysis failed: {str(e)}")
 
 @router.get("/session/{session_id}")
 async def get_session_analysis(session_id: str):
-    session_analyses = [a for a in analysis_results.values() if a["session_id"] == session_id]
+    session_analyses = await store.get_analyses(session_id)
     if not session_analyses:
         raise HTTPException(status_code=404, detail="No analysis found for session")
     return {"session_id": session_id, "analyses": session_analyses}
 
-@router.get("/report/{session_id}", response_model=None)
-async def generate_feedback_report(session_id: str):
-    try:
-        session_analyses = [a for a in analysis_results.values() if a["session_id"] == session_id]
-        if not session_analyses:
-            raise HTTPException(status_code=404, detail="No analysis data found for session")
+async def _build_report(session_id: str) -> dict:
+    session_analyses = await store.get_analyses(session_id)
+    if not session_analyses:
+        raise HTTPException(status_code=404, detail="No analysis data found for session")
+
+    has_video = any(a["analysis_type"] == "video" for a in session_analyses)
+
+    s = await store.get_summary(session_id) or EMPTY_SUMMARY
+
+    # One pass over the chunks, folding each into its question's running totals
+    agg = {}
+    for ch in s["chunks"]:
+        qn = ch.get("question_number") or 1
+        r = agg.get(qn)
+        if r is None:
+            r = agg[qn] = {"parts": [], "words": 0, "duration": 0.0, "conf_sum": 0.0, "n": 0,
+                           "time_only": ch.get("time_only", "")}
+        if ch.get("text"):
+            r["parts"].append(ch["text"])
+        r["words"] += ch.get("words", 0)
+        r["duration"] += ch.get("duration", 0.0)
+        r["conf_sum"] += ch.get("confidence", 0.0)
+        r["n"] += 1
+
+    transcript = []
+    for qn in sorted(agg):
+        r = agg[qn]
+        text = " ".join(r["parts"])
+        words = r["words"] or len(text.split())
+        duration = r["duration"]
+        confidence = r["conf_sum"] / r["n"]
+        time_only = r["time_only"]
+
+        # 🚫 filter out ghost rows (tiny/no content)
+        if words < 5 and duration < 1.0 and len(text.strip()) < 12:
+            continue
+
+        transcript.append({
+            "question": f"Response to Question {qn}",
+            "response": text,
+            "timestamp": time_only,
+            "duration": duration,
+            "confidence": confidence
+        })
 
-        audio_analyses = [a for a in session_analyses if a["analysis_type"] == "audio"]
-        video_analyses = [a for a in session_analyses if a["analysis_type"] == "video"]
+    avg_rate    = (s["rates_sum"] / s["rates_n"]) if s["rates_n"] else 0.0
+    avg_clarity = (s["clarities_sum"] / s["clarities_n"]) if s["clarities_n"] else 0.0
+    avg_conf    = (s["confidences_sum"] / s["confidences_n"]) if s["confidences_n"] else 0.5
 
-        s = session_summaries.get(session_id, {
-            "chunks": [], "total_words": 0, "total_duration": 0.0,
-            "filler": {"um":0,"uh":0,"like":0}, "rates": [], "clarities": [], "confidences": []
-        })
+    speech_score       = int(min(100, max(0, avg_clarity)))
+    body_language_score= 78 if has_video else 50
+    overall_score      = int((speech_score + body_language_score) / 2)
 
-        from collections import defaultdict as _dd
-        by_q = _dd(list)
-        for ch in s["chunks"]:
-            qn = ch.get("question_number") or 1
-            by_q[qn].append(ch)
-
-        transcript = []
-        for qn in sorted(by_q.keys()):
-            items = by_q[qn]
-            text = " ".join(i.get("text", "") for i in items if i.get("text"))
-            words = sum(i.get("words", 0) for i in items) or len(text.split())
-            duration = sum(i.get("duration", 0.0) for i in items)
-            confidence = (sum(i.get("confidence", 0.0) for i in items) / max(1, len(items)))
-            ts = items[0].get("timestamp", "") if items else ""
-
-            # 🚫 filter out ghost rows (tiny/no content)
-            if words < 5 and duration < 1.0 and len(text.strip()) < 12:
-                continue
-
-            transcript.append({
-                "question": f"Response to Question {qn}",
-                "response": text,
-                "timestamp": ts.split("T")[-1][:8] if ts else "",
-                "duration": duration,
-                "confidence": confidence
-            })
-
-        avg_rate    = (sum(s["rates"]) / len(s["rates"])) if s["rates"] else 0.0
-        avg_clarity = (sum(s["clarities"]) / len(s["clarities"])) if s["clarities"] else 0.0
-        avg_conf    = (sum(s["confidences"]) / len(s["confidences"])) if s["confidences"] else 0.5
-
-        speech_score       = int(min(100, max(0, avg_clarity)))
-        body_language_score= 50 if not video_analyses else 78
-        overall_score      = int((speech_score + body_language_score) / 2)
-
-        response_time_score= 80 if _speaking_rate_label(avg_rate) == "Good pace" else (40 if _speaking_rate_label(avg_rate) == "Too slow" else 60)
-        confidence_score   = int(round(avg_conf * 100))
-        content_score      = 70
-
-        payload = {
-            "session_id": session_id,
-            "overall_score": overall_score,
-            "speech_analysis": {
-                "score": speech_score,
-                "speaking_pace": _speaking_rate_label(avg_rate),
-                "clarity": int(avg_clarity),
-                "filler_words": {
-                    "um": s["filler"]["um"],
-                    "uh": s["filler"]["uh"],
-                    "like": s["filler"]["like"]
-                }
-            },
-            "body_language": {
-                "posture_score": body_language_score,
-                "eye_contact": "Good",
-                "gestures": "Appropriate"
-            },
-            "response_time_score": response_time_score,
-            "confidence_score": confidence_score,
-            "content_score": content_score,
-            "transcript": transcript,
-            "total_words": s["total_words"],
-            "posture_data": [
-                {"posture_class": "Good Posture"},
-                {"posture_class": "Nervous Expression"},
-                {"posture_class": "Confident Expression"},
-                {"posture_class": "Slouching"},
-                {"posture_class": "Good Posture"}
-            ]
-        }
-        return payload
+    pace_label         = _speaking_rate_label(avg_rate)
+    response_time_score= 80 if pace_label == "Good pace" else (40 if pace_label == "Too slow" else 60)
+    confidence_score   = int(round(avg_conf * 100))
+    content_score      = 70
+
+    payload = {
+        "session_id": session_id,
+        "overall_score": overall_score,
+        "speech_analysis": {
+            "score": speech_score,
+            "speaking_pace": pace_label,
+            "clarity": int(avg_clarity),
+            "filler_words": {
+                "um": s["filler"]["um"],
+                "uh": s["filler"]["uh"],
+                "like": s["filler"]["like"]
+            }
+        },
+        "body_language": {
+            "posture_score": body_language_score,
+            "eye_contact": "Good",
+            "gestures": "Appropriate"
+        },
+        "response_time_score": response_time_score,
+        "confidence_score": confidence_score,
+        "content_score": content_score,
+        "transcript": transcript,
+        "total_words": s["total_words"],
+        "posture_data": _SAMPLE_POSTURE_DATA
+    }
+    return payload
+
+
+@router.get("/report/{session_id}", response_model=None)
+async def generate_feedback_report(session_id: str, request: Request):
+    try:
+        body = await store.get_cached_report(session_id)
+        if body is None:
+            body = orjson.dumps(await _build_report(session_id))
+            await store.cache_report(session_id, body)
+
+        # Dashboards poll this; let unchanged reports revalidate as a bodiless 304
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         logger.error(f"Report generation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
 
 @router.get("/metrics/{session_id}")
 async def get_session_metrics(session_id: str):
-    session_analyses = [a for a in analysis_results.values() if a["session_id"] == session_id]
+    session_analyses = await store.get_analyses(session_id)
     if not session_analyses:
         raise HTTPException(status_code=404, detail="No analysis found for session")
+    by_type = Counter(a["analysis_type"] for a in session_analyses)
     metrics = {
         "total_analyses": len(session_analyses),
-        "audio_analyses": len([a for a in session_analyses if a["analysis_type"] == "audio"]),
-        "video_analyses": len([a for a in session_analyses if a["analysis_type"] == "video"]),
+        "audio_analyses": by_type["audio"],
+        "video_analyses": by_type["video"],
         "average_confidence": sum([a["confidence_score"] for a in session_analyses]) / len(session_analyses),
-        "latest_analysis": max(session_analyses, key=lambda x: x["timestamp"])["timestamp"]
+        # Records come back in insertion order, which is timestamp order
+        "latest_analysis": session_analyses[-1]["timestamp"]
     }
     return {"session_id": session_id, "metrics": metrics}
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Duplicate-upload cache hits/misses for this worker process (not per session)"""
+    return {"analysis_cache": dict(_digest_cache_stats), "entries": len(_analysis_by_digest)}
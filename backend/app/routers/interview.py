@@ -1,11 +1,26 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import uuid
 from datetime import datetime
 import json
+import asyncio, io, logging, os, re, shutil, time
+
+from app.services.session_store import get_store, SESSION_TTL_SECONDS
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = "recordings"
+# Created once at import so uploads don't pay a makedirs stat on every request
+os.makedirs(RECORDINGS_DIR, exist_ok=True)
+# Files written by submit_response: {session uuid}_{response uuid}_audio.wav / _video.mp4
+RECORDING_NAME_RE = re.compile(
+    r"([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})_.+_(?:audio\.wav|video\.mp4)"
+)
+# Large copy buffer: uploads are multi-megabyte audio/video, the default 64K means many more syscalls
+COPY_BUFFER_SIZE = 1024 * 1024
 
 class InterviewSessionCreate(BaseModel):
     name: str
@@ -31,9 +46,82 @@ class QuestionResponse(BaseModel):
     transcript: Optional[str] = None
     analysis_data: Optional[dict] = None
 
-# In-memory storage (replace with actual database)
-interview_sessions = {}
-question_responses = {}
+def _copy_in_kernel(src, dst) -> bool:
+    # Only once the spool has rolled over to disk; fileno() on an in-memory spool would force that
+    if not hasattr(os, "copy_file_range") or not getattr(src, "_rolled", True):
+        return False
+    try:
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        while os.copy_file_range(src_fd, dst_fd, 1 << 30):
+            pass
+        return True
+    except (OSError, AttributeError, io.UnsupportedOperation):
+        # Unsupported filesystem/kernel: rewind both sides and let the buffered copy redo it
+        src.seek(0); dst.seek(0); dst.truncate()
+        return False
+
+def _recording_path(filename: str) -> str:
+    # Names are built from server-generated ids, but never let one resolve outside the directory
+    path = os.path.join(RECORDINGS_DIR, filename)
+    base = os.path.realpath(RECORDINGS_DIR)
+    if os.path.commonpath([base, os.path.realpath(path)]) != base:
+        raise HTTPException(status_code=422, detail="Invalid recording name")
+    return path
+
+def _save_upload(src, path: str) -> None:
+    src.seek(0)
+    with open(path, "wb") as dst:
+        if not _copy_in_kernel(src, dst):
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+# Sessions and responses live in the shared store so every worker sees them
+store = get_store()
+
+_SESSION_FIELDS = tuple(InterviewSessionResponse.model_fields)
+
+def _session_response(session: dict) -> ORJSONResponse:
+    # Records are built by this router, so skip response_model's validation pass; the
+    # field filter still hides started_at/completed_at exactly as the model would
+    return ORJSONResponse({k: session[k] for k in _SESSION_FIELDS})
+
+async def _unlink_quietly(path: str) -> None:
+    try:
+        await asyncio.to_thread(os.unlink, path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Could not remove recording %s: %s", path, e)
+
+def _stale_recordings() -> dict:
+    # session_id -> recordings of that session not modified within the session TTL
+    cutoff = time.time() - SESSION_TTL_SECONDS
+    by_session = {}
+    with os.scandir(RECORDINGS_DIR) as entries:
+        for entry in entries:
+            m = RECORDING_NAME_RE.fullmatch(entry.name)
+            if m and entry.is_file() and entry.stat().st_mtime < cutoff:
+                by_session.setdefault(m.group(1), []).append(entry.path)
+    return by_session
+
+async def prune_orphaned_recordings() -> int:
+    """Delete old recordings whose session has expired out of the shared store"""
+    # The in-process fallback store starts empty on every restart/reload and differs per
+    # worker, so a missing session there proves nothing; only sweep against Redis
+    if store.redis is None:
+        return 0
+    removed = 0
+    for session_id, paths in (await asyncio.to_thread(_stale_recordings)).items():
+        if await store.get_interview(session_id) is None:
+            for path in paths:
+                await _unlink_quietly(path)
+            removed += len(paths)
+    return removed
+
+async def _require_session(session_id: str) -> dict:
+    session = await store.get_interview(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
 
 @router.post("/create", response_model=InterviewSessionResponse)
 async def create_interview_session(session_data: InterviewSessionCreate):
@@ -53,9 +141,9 @@ async def create_interview_session(session_data: InterviewSessionCreate):
             "status": "created"
         }
         
-        interview_sessions[session_id] = session
+        await store.put_interview(session)
         
-        return InterviewSessionResponse(**session)
+        return _session_response(session)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating session: {str(e)}")
@@ -63,30 +151,25 @@ async def create_interview_session(session_data: InterviewSessionCreate):
 @router.get("/{session_id}", response_model=InterviewSessionResponse)
 async def get_interview_session(session_id: str):
     """Get interview session details"""
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    return InterviewSessionResponse(**interview_sessions[session_id])
+    return _session_response(await _require_session(session_id))
 
 @router.post("/{session_id}/start")
 async def start_interview_session(session_id: str):
     """Start an interview session"""
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    interview_sessions[session_id]["status"] = "in_progress"
-    interview_sessions[session_id]["started_at"] = datetime.now()
+    session = await _require_session(session_id)
+    session["status"] = "in_progress"
+    session["started_at"] = datetime.now()
+    await store.put_interview(session)
     
     return {"message": "Interview session started", "session_id": session_id}
 
 @router.post("/{session_id}/complete")
 async def complete_interview_session(session_id: str):
     """Complete an interview session"""
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    interview_sessions[session_id]["status"] = "completed"
-    interview_sessions[session_id]["completed_at"] = datetime.now()
+    session = await _require_session(session_id)
+    session["status"] = "completed"
+    session["completed_at"] = datetime.now()
+    await store.put_interview(session)
     
     return {"message": "Interview session completed", "session_id": session_id}
 
@@ -99,22 +182,26 @@ async def submit_response(
     transcript: Optional[str] = None
 ):
     """Submit a response for a question"""
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    await _require_session(session_id)
     
     response_id = str(uuid.uuid4())
     
-    # Save uploaded files (implement actual file storage)
     audio_path = None
     video_path = None
     
+    # Disk writes run off the event loop so other requests aren't stalled behind the copy.
+    # Files are named by the ids we generated; question_id is client input and stays out of paths
+    saves = []
     if audio_file:
-        audio_path = f"recordings/{session_id}_{question_id}_audio.wav"
-        # Save audio file logic here
+        audio_path = _recording_path(f"{session_id}_{response_id}_audio.wav")
+        saves.append(asyncio.to_thread(_save_upload, audio_file.file, audio_path))
     
     if video_file:
-        video_path = f"recordings/{session_id}_{question_id}_video.mp4"
-        # Save video file logic here
+        video_path = _recording_path(f"{session_id}_{response_id}_video.mp4")
+        saves.append(asyncio.to_thread(_save_upload, video_file.file, video_path))
+    
+    # Audio and video land in separate files, so the two copies can overlap
+    await asyncio.gather(*saves)
     
     response_data = {
         "response_id": response_id,
@@ -127,43 +214,37 @@ async def submit_response(
         "analysis_status": "pending"
     }
     
-    question_responses[response_id] = response_data
+    await store.add_response(response_data)
     
     return {"message": "Response submitted", "response_id": response_id}
 
 @router.get("/{session_id}/responses")
 async def get_session_responses(session_id: str):
     """Get all responses for a session"""
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    await _require_session(session_id)
     
-    session_responses = [
-        response for response in question_responses.values()
-        if response["session_id"] == session_id
-    ]
+    session_responses = await store.get_responses(session_id)
     
-    return {"session_id": session_id, "responses": session_responses}
+    # orjson encodes the datetimes itself; returning the dict would run jsonable_encoder over every record first
+    return ORJSONResponse({"session_id": session_id, "responses": session_responses})
 
 @router.delete("/{session_id}")
 async def delete_interview_session(session_id: str):
     """Delete an interview session"""
-    if session_id not in interview_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    del interview_sessions[session_id]
+    await _require_session(session_id)
     
-    # Delete associated responses
-    responses_to_delete = [
-        response_id for response_id, response in question_responses.items()
-        if response["session_id"] == session_id
-    ]
+    # Recordings are only reachable through the responses, so remove them before those go
+    for response in await store.get_responses(session_id):
+        for path in (response.get("audio_path"), response.get("video_path")):
+            if path:
+                await _unlink_quietly(path)
     
-    for response_id in responses_to_delete:
-        del question_responses[response_id]
+    # Drops the associated responses along with it
+    await store.delete_interview(session_id)
     
     return {"message": "Session deleted successfully"}
 
 @router.get("/")
 async def list_interview_sessions():
     """List all interview sessions"""
-    return {"sessions": list(interview_sessions.values())}
+    return ORJSONResponse({"sessions": await store.list_interviews()})
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import json
@@ -67,6 +68,10 @@ QUESTION_TEMPLATES = {
     ]
 }
 
+_ALL_TYPES = tuple(QUESTION_TEMPLATES)
+_BASE_DURATION = 120  # 2 minutes
+_DURATION_BY_DIFFICULTY = {"easy": _BASE_DURATION - 30, "hard": _BASE_DURATION + 60}
+
 @router.post("/generate", response_model=QuestionSet)
 async def generate_questions(request: QuestionGenerationRequest):
     """Generate interview questions based on job description"""
@@ -77,38 +82,27 @@ async def generate_questions(request: QuestionGenerationRequest):
         # For now, use random selection from templates
         # In production, this would use AI (Deepseek/Ollama) to generate based on job description
         
-        for i in range(request.num_questions):
-            question_type = random.choice(question_types)
-            question_text = random.choice(QUESTION_TEMPLATES[question_type])
-            
-            # Estimate duration based on question type and difficulty
-            base_duration = 120  # 2 minutes
-            if request.difficulty_level == "easy":
-                duration = base_duration - 30
-            elif request.difficulty_level == "hard":
-                duration = base_duration + 60
-            else:
-                duration = base_duration
-                
-            question = QuestionResponse(
-                question_id=f"q_{i+1}",
-                question_text=question_text,
-                question_type=question_type,
-                difficulty=request.difficulty_level,
-                expected_duration=duration
-            )
-            questions.append(question)
-        
-        total_duration = sum([q.expected_duration for q in questions])
+        # Estimate duration based on difficulty; it's the same for every question in the set
+        duration = _DURATION_BY_DIFFICULTY.get(request.difficulty_level, _BASE_DURATION)
         
-        question_set = QuestionSet(
-            session_id=f"session_{random.randint(1000, 9999)}",
-            questions=questions,
-            total_questions=len(questions),
-            estimated_duration=total_duration
-        )
+        # Draw every question's type in one call rather than once per loop iteration
+        for i, question_type in enumerate(random.choices(question_types, k=request.num_questions)):
+            questions.append({
+                "question_id": f"q_{i+1}",
+                "question_text": random.choice(QUESTION_TEMPLATES[question_type]),
+                "question_type": question_type,
+                "difficulty": request.difficulty_level,
+                "expected_duration": duration
+            })
         
-        return question_set
+        # Fields come from the templates and the validated request, so the
+        # QuestionSet shape is built as plain dicts without a model round-trip
+        return ORJSONResponse({
+            "session_id": f"session_{random.randint(1000, 9999)}",
+            "questions": questions,
+            "total_questions": len(questions),
+            "estimated_duration": duration * len(questions)
+        })
     
     except Exception as e:
         logger.error(f"Question generation error: {str(e)}")
@@ -163,29 +157,28 @@ async def ai_generate_questions(request: QuestionGenerationRequest):
         
         # Mock AI response (replace with actual AI call)
         ai_questions = [
-            f"Based on the job description, {random.choice(QUESTION_TEMPLATES['behavioral'])}"
-            for _ in range(request.num_questions)
+            f"Based on the job description, {template}"
+            for template in random.choices(QUESTION_TEMPLATES['behavioral'], k=request.num_questions)
         ]
+        question_types = random.choices(request.question_types, k=request.num_questions)
         
-        questions = []
-        for i, question_text in enumerate(ai_questions):
-            question = QuestionResponse(
-                question_id=f"ai_q_{i+1}",
-                question_text=question_text,
-                question_type=random.choice(request.question_types),
-                difficulty=request.difficulty_level,
-                expected_duration=120
-            )
-            questions.append(question)
-        
-        question_set = QuestionSet(
-            session_id=f"ai_session_{random.randint(1000, 9999)}",
-            questions=questions,
-            total_questions=len(questions),
-            estimated_duration=sum([q.expected_duration for q in questions])
-        )
+        questions = [
+            {
+                "question_id": f"ai_q_{i+1}",
+                "question_text": question_text,
+                "question_type": question_type,
+                "difficulty": request.difficulty_level,
+                "expected_duration": _BASE_DURATION
+            }
+            for i, (question_text, question_type) in enumerate(zip(ai_questions, question_types))
+        ]
         
-        return question_set
+        return ORJSONResponse({
+            "session_id": f"ai_session_{random.randint(1000, 9999)}",
+            "questions": questions,
+            "total_questions": len(questions),
+            "estimated_duration": _BASE_DURATION * len(questions)
+        })
     
     except Exception as e:
         logger.error(f"AI question generation error: {str(e)}")
@@ -194,7 +187,7 @@ async def ai_generate_questions(request: QuestionGenerationRequest):
 @router.get("/")
 async def get_random_question():
     """Get a single random question"""
-    question_type = random.choice(list(QUESTION_TEMPLATES.keys()))
+    question_type = random.choice(_ALL_TYPES)
     question_text = random.choice(QUESTION_TEMPLATES[question_type])
     
     return {
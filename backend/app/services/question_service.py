@@ -1,19 +1,85 @@
 import asyncio
+import hashlib
 import json
 import logging
 import random
+import re
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from cachetools import TTLCache
+
 logger = logging.getLogger(__name__)
 
+# Question type cues, each matched in a single pass over the question text
+TECHNICAL_CUES_RE = re.compile(r"technical|technology|code|programming", re.IGNORECASE)
+SITUATIONAL_CUES_RE = re.compile(r"would you|how would|what if", re.IGNORECASE)
+
+# Generated question sets, least recently used evicted first, each kept for up to an hour
+QUESTION_CACHE_MAX = 256
+QUESTION_CACHE_TTL_SECONDS = 60 * 60
+
+DIFFICULTY_INSTRUCTIONS = {
+    "easy": "Generate straightforward questions suitable for entry-level positions.",
+    "medium": "Generate moderate difficulty questions for mid-level positions.",
+    "hard": "Generate challenging questions for senior-level positions."
+}
+
+# Fallback question templates by category, built once rather than on every call
+BEHAVIORAL_QUESTIONS = (
+    "Tell me about yourself and your background.",
+    "Describe a challenging situation you faced at work and how you handled it.",
+    "Give me an example of a time when you had to work with a difficult team member.",
+    "Tell me about a project you're particularly proud of.",
+    "Describe a time when you made a mistake and how you handled it.",
+    "How do you handle constructive criticism?",
+    "Tell me about a time when you had to learn something new quickly.",
+    "Describe your leadership style with a specific example.",
+    "How do you prioritize your work when facing multiple deadlines?",
+    "Tell me about a time when you had to persuade someone to see your point of view."
+)
+
+TECHNICAL_QUESTIONS = (
+    "How do you approach problem-solving in your field?",
+    "Describe a technical challenge you recently overcame.",
+    "How do you stay updated with the latest industry trends?",
+    "What tools and technologies do you prefer to work with and why?",
+    "How do you ensure quality in your work?",
+    "Describe your approach to learning new technologies.",
+    "What methodologies do you follow in your work process?",
+    "How do you handle technical debt or legacy systems?",
+    "Explain a complex concept from your field to someone non-technical."
+)
+
+SITUATIONAL_QUESTIONS = (
+    "How would you handle a project with an unrealistic deadline?",
+    "What would you do if you disagreed with your manager's approach?",
+    "How would you approach a task outside your area of expertise?",
+    "What would you do if you discovered an error in completed work?",
+    "How would you handle an unhappy client or customer?",
+    "What would you do if team members weren't contributing equally?",
+    "How would you approach working with outdated technology?",
+    "What would you do if you were falling behind on a project?",
+    "How would you handle a situation requiring resources you don't have?",
+    "What would you do if priorities changed suddenly during a project?"
+)
+
+# Common technical keywords
+TECH_KEYWORDS = (
+    "python", "javascript", "java", "react", "node", "sql", "mongodb",
+    "aws", "docker", "kubernetes", "api", "frontend", "backend",
+    "machine learning", "data science", "analytics", "cloud"
+)
+
 class QuestionGeneratorService:
     """Service for generating interview questions using AI models"""
     
     def __init__(self):
         self.deepseek_api_key = None
         self.ollama_endpoint = None
-        self.question_cache = {}
+        self.question_cache: Dict[str, List[Dict]] = TTLCache(maxsize=QUESTION_CACHE_MAX, ttl=QUESTION_CACHE_TTL_SECONDS)
+        # cache_key -> generation already running, so concurrent identical requests share one upstream call
+        self._inflight: Dict[str, asyncio.Future] = {}
         
     async def initialize(self):
         """Initialize the question generation service"""
@@ -35,48 +101,55 @@ class QuestionGeneratorService:
                                   difficulty: str = "medium") -> List[Dict]:
         """Generate questions using AI (Deepseek or Ollama)"""
         try:
-            # Create cache key
-            cache_key = f"{hash(job_description)}_{num_questions}_{difficulty}"
+            # Stable digest: hash() of a str is salted per process and collides on its 64 bits
+            cache_key = hashlib.blake2b(f"{difficulty}|{num_questions}|{job_description}".encode(),
+                                        digest_size=16).hexdigest()
             
             # Check cache first
-            if cache_key in self.question_cache:
+            cached = self.question_cache.get(cache_key)
+            if cached is not None:
                 logger.info("Returning cached questions")
-                return self.question_cache[cache_key]
-            
-            # Prepare AI prompt
-            prompt = self._create_question_prompt(job_description, num_questions, difficulty)
-            
-            # Try Deepseek first, then fallback to Ollama
-            questions = await self._try_deepseek_generation(prompt, num_questions)
-            
-            if not questions:
-                questions = await self._try_ollama_generation(prompt, num_questions)
+                return cached
             
-            if not questions:
-                # Fallback to template-based generation
-                questions = self._generate_fallback_questions(job_description, num_questions, difficulty)
-            
-            # Cache the results
-            self.question_cache[cache_key] = questions
-            
-            return questions
+            fut = self._inflight.get(cache_key)
+            if fut is None:
+                fut = asyncio.ensure_future(
+                    self._generate_and_cache(cache_key, job_description, num_questions, difficulty))
+                self._inflight[cache_key] = fut
+                fut.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+            # Shielded so one caller disconnecting doesn't cancel the generation the others await
+            return await asyncio.shield(fut)
             
         except Exception as e:
             logger.error(f"AI question generation error: {str(e)}")
             return self._generate_fallback_questions(job_description, num_questions, difficulty)
     
+    async def _generate_and_cache(self, cache_key: str, job_description: str, num_questions: int,
+                                  difficulty: str) -> List[Dict]:
+        # Prepare AI prompt
+        prompt = self._create_question_prompt(job_description, num_questions, difficulty)
+        
+        # Try Deepseek first, then fallback to Ollama
+        questions = await self._try_deepseek_generation(prompt, num_questions)
+        
+        if not questions:
+            questions = await self._try_ollama_generation(prompt, num_questions)
+        
+        if not questions:
+            # Fallback to template-based generation
+            questions = self._generate_fallback_questions(job_description, num_questions, difficulty)
+        
+        # Cache the results
+        self.question_cache[cache_key] = questions
+        
+        return questions
+    
     def _create_question_prompt(self, job_description: str, num_questions: int, difficulty: str) -> str:
         """Create AI prompt for question generation"""
         
-        difficulty_instructions = {
-            "easy": "Generate straightforward questions suitable for entry-level positions.",
-            "medium": "Generate moderate difficulty questions for mid-level positions.",
-            "hard": "Generate challenging questions for senior-level positions."
-        }
-        
         prompt = f"""
         You are an expert interview coach. Generate {num_questions} professional interview questions 
-        based on the following job description. {difficulty_instructions.get(difficulty, "")}
+        based on the following job description. {DIFFICULTY_INSTRUCTIONS.get(difficulty, "")}
         
         Job Description:
         {job_description}
@@ -197,9 +270,9 @@ class QuestionGeneratorService:
         """Format question into standard structure"""
         # Determine question type based on content
         question_type = "behavioral"
-        if any(word in question_text.lower() for word in ["technical", "technology", "code", "programming"]):
+        if TECHNICAL_CUES_RE.search(question_text):
             question_type = "technical"
-        elif any(word in question_text.lower() for word in ["would you", "how would", "what if"]):
+        elif SITUATIONAL_CUES_RE.search(question_text):
             question_type = "situational"
         
         return {
@@ -218,45 +291,10 @@ class QuestionGeneratorService:
         # Analyze job description for keywords
         keywords = self._extract_job_keywords(job_description.lower())
         
-        # Question templates by category
-        behavioral_questions = [
-            "Tell me about yourself and your background.",
-            "Describe a challenging situation you faced at work and how you handled it.",
-            "Give me an example of a time when you had to work with a difficult team member.",
-            "Tell me about a project you're particularly proud of.",
-            "Describe a time when you made a mistake and how you handled it.",
-            "How do you handle constructive criticism?",
-            "Tell me about a time when you had to learn something new quickly.",
-            "Describe your leadership style with a specific example.",
-            "How do you prioritize your work when facing multiple deadlines?",
-            "Tell me about a time when you had to persuade someone to see your point of view."
-        ]
-        
-        technical_questions = [
+        # Question templates by category; the first technical one is tailored to the job's keywords
+        technical_questions = (
             f"What experience do you have with {', '.join(keywords[:3])}?" if keywords else "What technical skills are you most proud of?",
-            "How do you approach problem-solving in your field?",
-            "Describe a technical challenge you recently overcame.",
-            "How do you stay updated with the latest industry trends?",
-            "What tools and technologies do you prefer to work with and why?",
-            "How do you ensure quality in your work?",
-            "Describe your approach to learning new technologies.",
-            "What methodologies do you follow in your work process?",
-            "How do you handle technical debt or legacy systems?",
-            "Explain a complex concept from your field to someone non-technical."
-        ]
-        
-        situational_questions = [
-            "How would you handle a project with an unrealistic deadline?",
-            "What would you do if you disagreed with your manager's approach?",
-            "How would you approach a task outside your area of expertise?",
-            "What would you do if you discovered an error in completed work?",
-            "How would you handle an unhappy client or customer?",
-            "What would you do if team members weren't contributing equally?",
-            "How would you approach working with outdated technology?",
-            "What would you do if you were falling behind on a project?",
-            "How would you handle a situation requiring resources you don't have?",
-            "What would you do if priorities changed suddenly during a project?"
-        ]
+        ) + TECHNICAL_QUESTIONS
         
         # Select questions based on difficulty and job description
         all_questions = []
@@ -267,7 +305,7 @@ class QuestionGeneratorService:
         situational_count = num_questions - behavioral_count - technical_count
         
         # Select behavioral questions
-        selected_behavioral = random.sample(behavioral_questions, min(behavioral_count, len(behavioral_questions)))
+        selected_behavioral = random.sample(BEHAVIORAL_QUESTIONS, min(behavioral_count, len(BEHAVIORAL_QUESTIONS)))
         for i, q in enumerate(selected_behavioral):
             all_questions.append({
                 "question_id": f"fallback_b_{i+1}",
@@ -291,7 +329,7 @@ class QuestionGeneratorService:
             })
         
         # Select situational questions
-        selected_situational = random.sample(situational_questions, min(situational_count, len(situational_questions)))
+        selected_situational = random.sample(SITUATIONAL_QUESTIONS, min(situational_count, len(SITUATIONAL_QUESTIONS)))
         for i, q in enumerate(selected_situational):
             all_questions.append({
                 "question_id": f"fallback_s_{i+1}",
@@ -308,15 +346,8 @@ class QuestionGeneratorService:
     
     def _extract_job_keywords(self, job_description: str) -> List[str]:
         """Extract relevant keywords from job description"""
-        # Common technical keywords
-        tech_keywords = [
-            "python", "javascript", "java", "react", "node", "sql", "mongodb",
-            "aws", "docker", "kubernetes", "api", "frontend", "backend",
-            "machine learning", "data science", "analytics", "cloud"
-        ]
-        
         found_keywords = []
-        for keyword in tech_keywords:
+        for keyword in TECH_KEYWORDS:
             if keyword in job_description:
                 found_keywords.append(keyword)
         
@@ -0,0 +1,272 @@
+import itertools
+import logging
+import os
+from collections import Counter, deque
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Optional
+
+import orjson
+from cachetools import TTLCache
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Redis client not available: {e}")
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Per-session keys expire after a day so Redis memory stays bounded
+SESSION_TTL_SECONDS = 24 * 60 * 60
+REPORT_TTL_SECONDS = 300
+# In-process fallback keeps at most this many analysis records (same TTL as Redis)
+MAX_LOCAL_ANALYSES = 10_000
+# ...and per-session summaries/tallies for at most this many sessions
+MAX_LOCAL_SESSIONS = 1_000
+# Only the most recent chunks are kept per session; running totals still cover all of them
+MAX_SUMMARY_CHUNKS = 512
+
+# Shared read-only stand-in for sessions with no recorded speech
+EMPTY_SUMMARY = MappingProxyType({
+    "chunks": (), "total_words": 0, "total_duration": 0.0,
+    "filler": MappingProxyType({"um": 0, "uh": 0, "like": 0}),
+    "rates_sum": 0.0, "rates_n": 0, "clarities_sum": 0.0, "clarities_n": 0,
+    "confidences_sum": 0.0, "confidences_n": 0
+})
+
+
+def _new_summary() -> dict:
+    return {
+        "chunks": deque(maxlen=MAX_SUMMARY_CHUNKS), "total_words": 0, "total_duration": 0.0,
+        "filler": Counter({"um": 0, "uh": 0, "like": 0}),
+        "rates_sum": 0.0, "rates_n": 0, "clarities_sum": 0.0, "clarities_n": 0,
+        "confidences_sum": 0.0, "confidences_n": 0
+    }
+
+
+class SessionStore:
+    """Analysis records and running session summaries, shared across workers via Redis.
+
+    Falls back to process-local dicts when REDIS_URL is unset or redis is not installed,
+    which is only correct for a single uvicorn worker.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis = None
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        if redis_url and REDIS_AVAILABLE:
+            self.redis = aioredis.from_url(redis_url, decode_responses=True)
+            logger.info("Session store using Redis at %s", redis_url)
+        else:
+            logger.warning("Session store using in-process memory (set REDIS_URL for multi-worker)")
+
+        # In-memory fallback
+        self.analysis_results: Dict[str, dict] = TTLCache(maxsize=MAX_LOCAL_ANALYSES, ttl=SESSION_TTL_SECONDS)
+        # session_id -> analysis ids, so per-session reads skip the full scan
+        self.session_index: Dict[str, List[str]] = TTLCache(maxsize=MAX_LOCAL_ANALYSES, ttl=SESSION_TTL_SECONDS)
+        self.analysis_seq = itertools.count()
+        self.report_cache: Dict[str, bytes] = TTLCache(maxsize=MAX_LOCAL_SESSIONS, ttl=REPORT_TTL_SECONDS)
+        self.session_summaries: Dict[str, dict] = TTLCache(maxsize=MAX_LOCAL_SESSIONS, ttl=SESSION_TTL_SECONDS)
+        self.posture_counts: Dict[str, Counter] = TTLCache(maxsize=MAX_LOCAL_SESSIONS, ttl=SESSION_TTL_SECONDS)
+        self.interview_sessions: Dict[str, dict] = TTLCache(maxsize=MAX_LOCAL_SESSIONS, ttl=SESSION_TTL_SECONDS)
+        # session_id -> submitted responses, in submission order
+        self.interview_responses: Dict[str, List[dict]] = TTLCache(maxsize=MAX_LOCAL_SESSIONS, ttl=SESSION_TTL_SECONDS)
+
+    async def next_analysis_id(self, analysis_type: str, session_id: str) -> str:
+        """Allocate a unique analysis id"""
+        if self.redis:
+            n = await self.redis.incr("analysis:seq") - 1
+        else:
+            n = next(self.analysis_seq)
+        return f"{analysis_type}_{session_id}_{n}"
+
+    async def add_analysis(self, record: dict) -> None:
+        """Store an analysis record (AnalysisResponse shape)"""
+        if self.redis:
+            key = f"analyses:{record['session_id']}"
+            pipe = self.redis.pipeline()
+            pipe.rpush(key, orjson.dumps(record))
+            pipe.expire(key, SESSION_TTL_SECONDS)
+            pipe.delete(f"report:{record['session_id']}")
+            await pipe.execute()
+            return
+        sid = record["session_id"]
+        self.analysis_results[record["analysis_id"]] = record
+        ids = self.session_index.get(sid, [])
+        ids.append(record["analysis_id"])
+        # Re-assigning refreshes the index entry's TTL along with the record's
+        self.session_index[sid] = ids
+        self.report_cache.pop(sid, None)
+
+    async def get_analyses(self, session_id: str) -> List[dict]:
+        """All analysis records for a session, in insertion order"""
+        if self.redis:
+            return [orjson.loads(a) for a in await self.redis.lrange(f"analyses:{session_id}", 0, -1)]
+        records = (self.analysis_results.get(aid) for aid in self.session_index.get(session_id, ()))
+        return [r for r in records if r is not None]
+
+    async def append_chunk(self, session_id: str, chunk: dict, filler: Dict[str, int],
+                           speaking_rate=None, clarity_score=None, confidence: float = 0.0) -> None:
+        """Fold one transcribed chunk into the session's running summary"""
+        if self.redis:
+            sid = session_id
+            keys = (f"sum:{sid}", f"sum:{sid}:chunks", f"sum:{sid}:filler")
+            pipe = self.redis.pipeline()
+            pipe.rpush(f"sum:{sid}:chunks", orjson.dumps(chunk))
+            pipe.ltrim(f"sum:{sid}:chunks", -MAX_SUMMARY_CHUNKS, -1)
+            pipe.hincrby(f"sum:{sid}", "total_words", chunk["words"])
+            pipe.hincrbyfloat(f"sum:{sid}", "total_duration", chunk["duration"])
+            for k in ("um", "uh", "like"):
+                pipe.hincrby(f"sum:{sid}:filler", k, filler[k])
+            if isinstance(speaking_rate, (int, float)):
+                pipe.hincrbyfloat(f"sum:{sid}", "rates_sum", float(speaking_rate))
+                pipe.hincrby(f"sum:{sid}", "rates_n", 1)
+            if isinstance(clarity_score, (int, float)):
+                pipe.hincrbyfloat(f"sum:{sid}", "clarities_sum", float(clarity_score))
+                pipe.hincrby(f"sum:{sid}", "clarities_n", 1)
+            pipe.hincrbyfloat(f"sum:{sid}", "confidences_sum", confidence)
+            pipe.hincrby(f"sum:{sid}", "confidences_n", 1)
+            for key in keys:
+                pipe.expire(key, SESSION_TTL_SECONDS)
+            pipe.delete(f"report:{sid}")
+            await pipe.execute()
+            return
+
+        s = self.session_summaries.get(session_id)
+        if s is None:
+            s = self.session_summaries[session_id] = _new_summary()
+        s["chunks"].append(chunk)
+        s["total_words"] += chunk["words"]
+        s["total_duration"] += chunk["duration"]
+        s["filler"].update({"um": filler["um"], "uh": filler["uh"], "like": filler["like"]})
+        if isinstance(speaking_rate, (int, float)):
+            s["rates_sum"] += float(speaking_rate); s["rates_n"] += 1
+        if isinstance(clarity_score, (int, float)):
+            s["clarities_sum"] += float(clarity_score); s["clarities_n"] += 1
+        s["confidences_sum"] += confidence; s["confidences_n"] += 1
+        self.report_cache.pop(session_id, None)
+
+    async def get_summary(self, session_id: str) -> Optional[dict]:
+        """Running summary for a session, or None if nothing has been recorded"""
+        if self.redis:
+            sid = session_id
+            pipe = self.redis.pipeline()
+            pipe.hgetall(f"sum:{sid}")
+            pipe.lrange(f"sum:{sid}:chunks", 0, -1)
+            pipe.hgetall(f"sum:{sid}:filler")
+            totals, chunks, filler = await pipe.execute()
+            if not chunks:
+                return None
+            return {
+                "chunks": [orjson.loads(c) for c in chunks],
+                "total_words": int(totals.get("total_words", 0)),
+                "total_duration": float(totals.get("total_duration", 0.0)),
+                "filler": {k: int(filler.get(k, 0)) for k in ("um", "uh", "like")},
+                **{f"{m}_sum": float(totals.get(f"{m}_sum", 0.0)) for m in ("rates", "clarities", "confidences")},
+                **{f"{m}_n": int(totals.get(f"{m}_n", 0)) for m in ("rates", "clarities", "confidences")},
+            }
+        return self.session_summaries.get(session_id)
+
+    async def incr_posture(self, session_id: str, posture: str) -> None:
+        """Count one frame classified as the given posture"""
+        if self.redis:
+            key = f"posture:{session_id}"
+            pipe = self.redis.pipeline()
+            pipe.hincrby(key, posture, 1)
+            pipe.expire(key, SESSION_TTL_SECONDS)
+            await pipe.execute()
+            return
+        counts = self.posture_counts.get(session_id)
+        if counts is None:
+            counts = self.posture_counts[session_id] = Counter()
+        counts[posture] += 1
+
+    async def get_posture_counts(self, session_id: str) -> Counter:
+        """Frame counts per posture classification for a session"""
+        if self.redis:
+            return Counter({k: int(v) for k, v in (await self.redis.hgetall(f"posture:{session_id}")).items()})
+        return self.posture_counts.get(session_id, Counter())
+
+    async def get_cached_report(self, session_id: str) -> Optional[bytes]:
+        """Previously built report body (JSON bytes), if the session has not changed since"""
+        if self.redis:
+            cached = await self.redis.get(f"report:{session_id}")
+            return cached.encode() if cached else None
+        return self.report_cache.get(session_id)
+
+    async def cache_report(self, session_id: str, body: bytes) -> None:
+        """Remember a built report body until the session's data changes (writes invalidate it)"""
+        if self.redis:
+            await self.redis.set(f"report:{session_id}", body, ex=REPORT_TTL_SECONDS)
+            return
+        self.report_cache[session_id] = body
+
+    async def get_interview(self, session_id: str) -> Optional[dict]:
+        """Interview session record, or None if it does not exist (or has expired)"""
+        if self.redis:
+            raw = await self.redis.get(f"interview:{session_id}")
+            return orjson.loads(raw) if raw else None
+        return self.interview_sessions.get(session_id)
+
+    async def put_interview(self, session: dict) -> None:
+        """Create or overwrite an interview session record"""
+        sid = session["session_id"]
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.set(f"interview:{sid}", orjson.dumps(session), ex=SESSION_TTL_SECONDS)
+            pipe.sadd("interview:ids", sid)
+            await pipe.execute()
+            return
+        self.interview_sessions[sid] = session
+
+    async def delete_interview(self, session_id: str) -> None:
+        """Drop an interview session and every response submitted to it"""
+        if self.redis:
+            pipe = self.redis.pipeline()
+            pipe.delete(f"interview:{session_id}", f"interview:{session_id}:responses")
+            pipe.srem("interview:ids", session_id)
+            await pipe.execute()
+            return
+        self.interview_sessions.pop(session_id, None)
+        self.interview_responses.pop(session_id, None)
+
+    async def list_interviews(self) -> List[dict]:
+        """All live interview sessions"""
+        if self.redis:
+            ids = list(await self.redis.smembers("interview:ids"))
+            if not ids:
+                return []
+            raws = await self.redis.mget([f"interview:{sid}" for sid in ids])
+            expired = [sid for sid, raw in zip(ids, raws) if raw is None]
+            if expired:
+                await self.redis.srem("interview:ids", *expired)
+            return [orjson.loads(raw) for raw in raws if raw is not None]
+        return list(self.interview_sessions.values())
+
+    async def add_response(self, record: dict) -> None:
+        """Append a submitted answer to its interview session"""
+        sid = record["session_id"]
+        if self.redis:
+            key = f"interview:{sid}:responses"
+            pipe = self.redis.pipeline()
+            pipe.rpush(key, orjson.dumps(record))
+            pipe.expire(key, SESSION_TTL_SECONDS)
+            await pipe.execute()
+            return
+        responses = self.interview_responses.get(sid, [])
+        responses.append(record)
+        self.interview_responses[sid] = responses
+
+    async def get_responses(self, session_id: str) -> List[dict]:
+        """Responses submitted to an interview session, in submission order"""
+        if self.redis:
+            return [orjson.loads(r) for r in await self.redis.lrange(f"interview:{session_id}:responses", 0, -1)]
+        return list(self.interview_responses.get(session_id, ()))
+
+
+@lru_cache(maxsize=1)
+def get_store() -> SessionStore:
+    """Process-wide SessionStore, so every caller shares one Redis connection pool"""
+    return SessionStore()
@@ -6,6 +6,8 @@ import numpy as np
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from app.services.session_store import get_store
+
 # Mock imports for video analysis (replace with actual implementations)
 # from video_analysis.detection_utils import detect_posture
 # from video_analysis.model import ActionDetectionModel
@@ -19,6 +21,7 @@ class VideoAnalysisService:
         self.model = None
         self.session_data = {}
         self.posture_history = {}
+        self.store = get_store()
         
     async def initialize(self):
         """Initialize the video analysis components"""
@@ -87,11 +90,17 @@ class VideoAnalysisService:
             # Update posture history
             self._update_posture_history(session_id, analysis_result["posture_analysis"])
             
-            return analysis_result
-            
         except Exception as e:
             logger.error(f"Frame analysis error: {str(e)}")
             return {"error": str(e)}
+        
+        # Outside the analysis try: a store hiccup costs one tally, not an already-analysed frame
+        try:
+            await self.store.incr_posture(session_id, analysis_result["posture_analysis"]["posture_classification"])
+        except Exception as e:
+            logger.warning(f"Posture tally not recorded for session {session_id}: {str(e)}")
+        
+        return analysis_result
     
     async def analyze_video_sequence(self, video_frames: List[bytes], session_id: str) -> Dict:
         """Analyze a sequence of video frames for comprehensive metrics"""
@@ -143,12 +152,10 @@ class VideoAnalysisService:
             for frame in session_frames
         ])
         
-        posture_classifications = [
-            frame.get("posture_analysis", {}).get("posture_classification", "unknown")
-            for frame in session_frames
-        ]
-        
-        most_common_posture = max(set(posture_classifications), key=posture_classifications.count)
+        # Posture tallies come from the shared store (every worker's frames); the frame-level
+        # metrics above and below are still computed from this process's session_data only
+        posture_counts = await self.store.get_posture_counts(session_id)
+        most_common_posture = posture_counts.most_common(1)[0][0] if posture_counts else "unknown"
         
         summary = {
             "session_id": session_id,
@@ -158,7 +165,7 @@ class VideoAnalysisService:
                 "average_posture_score": float(avg_posture_score),
                 "average_eye_contact_score": float(avg_eye_contact),
                 "dominant_posture": most_common_posture,
-                "posture_changes": len(set(posture_classifications)),
+                "posture_changes": len(posture_counts),
                 "fidgeting_percentage": self._calculate_fidgeting_percentage(session_frames)
             },
             "behavioral_insights": {
@@ -1,8 +1,8 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
-import json
+import orjson
 import asyncio
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -12,7 +12,7 @@ import logging
 from app.routers import interview, analysis, questions
 
 # Import services
-from app.services.speech_service import SpeechAnalysisService
+from app.services.speech_service import get_speech_service
 from app.services.video_service import VideoAnalysisService
 from app.services.question_service import QuestionGeneratorService
 
@@ -25,7 +25,8 @@ logging.getLogger("app.routers.analysis").setLevel(logging.DEBUG)
 app = FastAPI(
     title="PrepWise API",
     description="Mock Interview Platform Backend API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -38,7 +39,7 @@ app.add_middleware(
 )
 
 # Global services
-speech_service = SpeechAnalysisService()
+speech_service = get_speech_service()
 video_service = VideoAnalysisService()
 question_service = QuestionGeneratorService()
 
@@ -63,7 +64,7 @@ class ConnectionManager:
 
     async def send_analysis_data(self, data: dict, session_id: str):
         if session_id in self.active_connections:
-            await self.active_connections[session_id].send_text(json.dumps(data))
+            await self.active_connections[session_id].send_text(orjson.dumps(data).decode())
 
 manager = ConnectionManager()
 
@@ -95,7 +96,7 @@ async def websocket_interview_endpoint(websocket: WebSocket, session_id: str):
         while True:
             # Receive data from client
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = orjson.loads(data)
             
             # Process based on message type
             if message["type"] == "audio_data":
@@ -152,9 +153,26 @@ async def background_analysis_task():
             logger.error(f"Background task error: {str(e)}")
             await asyncio.sleep(60)  # Wait longer if there's an error
 
+async def recordings_cleanup_task():
+    """Hourly sweep of recordings left behind by sessions that expired out of the store"""
+    while True:
+        # Sleep first: nothing recorded since startup can be stale yet
+        await asyncio.sleep(60 * 60)
+        try:
+            removed = await interview.prune_orphaned_recordings()
+            if removed:
+                logger.info("Removed %d orphaned recordings", removed)
+        except Exception as e:
+            logger.error(f"Recordings cleanup error: {str(e)}")
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("PrepWise API starting up...")
+
+    # uvicorn's default loop="auto" picks uvloop whenever it is installed (not on Windows)
+    loop_module = type(asyncio.get_running_loop()).__module__
+    if not loop_module.startswith("uvloop"):
+        logger.warning("Running on the stock asyncio loop (%s); install uvloop for higher throughput", loop_module)
     
     # Initialize services
     await speech_service.initialize()
@@ -163,6 +181,7 @@ async def startup_event():
     
     # Start background tasks
     asyncio.create_task(background_analysis_task())
+    asyncio.create_task(recordings_cleanup_task())
     
     logger.info("PrepWise API startup complete")
 
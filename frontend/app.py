@@ -1,10 +1,14 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for, session
 import uuid
+import hashlib
+import time
 import requests
 import json
 import os
 import re
+import threading
 from datetime import datetime
+from cachetools import TTLCache
 import google.generativeai as genai
 
 app = Flask(__name__)
@@ -24,6 +28,38 @@ BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:8000")
 # Temporary storage for large data that can't fit in session cookies
 temp_data_store = {}
 
+# Gemini transcript scores keyed by prompt digest -> (expires_at, result), so reloading
+# the feedback page for the same interview doesn't pay for another LLM call
+AI_ANALYSIS_CACHE = {}
+AI_ANALYSIS_TTL_SECONDS = 60 * 60
+AI_ANALYSIS_CACHE_MAX = 256
+
+# Generated (question, hint) pairs keyed by digest of session id + prompt. The session id
+# is minted per interview setup, so a new practice attempt on the same job description gets
+# fresh questions; hits are only retries within one attempt. Flask serves requests on
+# threads, so access goes through the lock
+QUESTION_CACHE_TTL_SECONDS = 60 * 60
+QUESTION_CACHE_MAX = 1024
+QUESTION_CACHE = TTLCache(maxsize=QUESTION_CACHE_MAX, ttl=QUESTION_CACHE_TTL_SECONDS)
+QUESTION_CACHE_LOCK = threading.Lock()
+
+# Patterns for pulling the question/hint out of Gemini's JSON-ish replies
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+QUESTION_FIELD_RE = re.compile(r'"question":\s*"([^"]+)"')
+HINT_FIELD_RE = re.compile(r'"hint":\s*"([^"]+)"')
+
+# Experience level indicators, each list matched in a single pass over the job description
+ENTRY_LEVEL_RE = re.compile('|'.join(map(re.escape, [
+    'entry level', 'junior', 'graduate', 'internship', 'trainee', 'beginner',
+    'new grad', 'fresh', 'starter', '0-1 year', '0-2 year', 'recent graduate'])), re.IGNORECASE)
+SENIOR_LEVEL_RE = re.compile('|'.join(map(re.escape, [
+    'senior', 'lead', 'principal', 'architect', 'manager', 'director',
+    '5+ year', '7+ year', '10+ year', 'expert', 'advanced', 'leadership'])), re.IGNORECASE)
+
+# Role keywords that pick the fallback question bank
+DATA_ROLE_RE = re.compile('|'.join(map(re.escape, ['data analyst', 'data', 'analytics'])), re.IGNORECASE)
+SOFTWARE_ROLE_RE = re.compile('|'.join(map(re.escape, ['software', 'developer', 'programming'])), re.IGNORECASE)
+
 # Analytics data storage file
 ANALYTICS_DATA_FILE = 'analytics_data.json'
 
@@ -314,6 +350,11 @@ def feedback():
             
             Consider: relevance to role, communication clarity, technical knowledge, completeness of answers. Provide constructive, specific feedback in valid JSON format only."""
             
+            cache_key = hashlib.blake2b(analysis_prompt.encode(), digest_size=16).hexdigest()
+            cached = AI_ANALYSIS_CACHE.get(cache_key)
+            if cached and cached[0] > time.time():
+                return cached[1]
+            
             response = gemini_model.generate_content(analysis_prompt)
             ai_response = response.text.strip()
             print(f"🤖 Gemini Analysis Response: {ai_response}")
@@ -321,6 +362,9 @@ def feedback():
             # Parse the JSON response
             try:
                 analysis_result = json.loads(ai_response)
+                if len(AI_ANALYSIS_CACHE) >= AI_ANALYSIS_CACHE_MAX:
+                    AI_ANALYSIS_CACHE.pop(next(iter(AI_ANALYSIS_CACHE)))  # drop the oldest entry
+                AI_ANALYSIS_CACHE[cache_key] = (time.time() + AI_ANALYSIS_TTL_SECONDS, analysis_result)
                 return analysis_result
             except json.JSONDecodeError:
                 print("❌ Failed to parse Gemini response as JSON")
@@ -774,21 +818,11 @@ def generate_question():
     # Analyze experience level and determine question type
     def analyze_job_level(job_desc):
         """Analyze job description to determine experience level"""
-        job_lower = job_desc.lower()
-        
-        # Entry level indicators
-        entry_keywords = ['entry level', 'junior', 'graduate', 'internship', 'trainee', 'beginner', 
-                         'new grad', 'fresh', 'starter', '0-1 year', '0-2 year', 'recent graduate']
-        
-        # Senior level indicators  
-        senior_keywords = ['senior', 'lead', 'principal', 'architect', 'manager', 'director',
-                          '5+ year', '7+ year', '10+ year', 'expert', 'advanced', 'leadership']
-        
         # Check for entry level
-        if any(keyword in job_lower for keyword in entry_keywords):
+        if ENTRY_LEVEL_RE.search(job_desc):
             return 'entry'
         # Check for senior level
-        elif any(keyword in job_lower for keyword in senior_keywords):
+        elif SENIOR_LEVEL_RE.search(job_desc):
             return 'senior'
         else:
             return 'mid'  # Default to mid-level
@@ -871,6 +905,15 @@ CRITICAL REQUIREMENTS:
 
 Do not include any text before or after the JSON."""
             
+            cache_key = hashlib.blake2b(f"{session_id}|{prompt}".encode(), digest_size=16).hexdigest()
+            with QUESTION_CACHE_LOCK:
+                cached = QUESTION_CACHE.get(cache_key)
+            if cached:
+                question, hint = cached
+                session['asked_questions'].append(question)
+                session.modified = True
+                return jsonify({'question': question, 'hint': hint})
+            
             response = gemini_model.generate_content(prompt)
             ai_response = response.text.strip()
             
@@ -879,10 +922,9 @@ Do not include any text before or after the JSON."""
             try:
                 # Clean up the response - remove any markdown formatting or extra text
                 import json
-                import re
                 
                 # Try to extract JSON from the response
-                json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
+                json_match = JSON_OBJECT_RE.search(ai_response)
                 if json_match:
                     json_str = json_match.group(0)
                     response_data = json.loads(json_str)
@@ -907,8 +949,8 @@ Do not include any text before or after the JSON."""
                     # Try to extract question from malformed JSON response
                     try:
                         # Look for question pattern in the text
-                        question_match = re.search(r'"question":\s*"([^"]+)"', ai_response)
-                        hint_match = re.search(r'"hint":\s*"([^"]+)"', ai_response)
+                        question_match = QUESTION_FIELD_RE.search(ai_response)
+                        hint_match = HINT_FIELD_RE.search(ai_response)
                         
                         if question_match:
                             question = question_match.group(1).strip()
@@ -930,6 +972,9 @@ Do not include any text before or after the JSON."""
                 print("🔄 Falling back to structured questions")
                 raise ValueError("Invalid question generated")
             
+            with QUESTION_CACHE_LOCK:
+                QUESTION_CACHE[cache_key] = (question, hint)
+            
             # Track the question to avoid repeats
             session['asked_questions'].append(question)
             session.modified = True
@@ -946,10 +991,8 @@ Do not include any text before or after the JSON."""
         print("🔄 Using intelligent fallback questions")
         
     # Enhanced fallback to contextual questions based on job description keywords and experience level
-    job_lower = full_job_description.lower()
-    
     # Create experience-appropriate questions
-    if 'data analyst' in job_lower or 'data' in job_lower or 'analytics' in job_lower:
+    if DATA_ROLE_RE.search(full_job_description):
         if experience_level == 'entry':
             fallback_questions = [
                 {"question": "What drew you to data analysis as a career?", "hint": "Share your interest in working with data and any relevant coursework, projects, or experiences.", "type": "behavioral"},
@@ -977,7 +1020,7 @@ Do not include any text before or after the JSON."""
                 {"question": "Describe a challenging data project and how you overcame obstacles.", "hint": "Focus on problem-solving skills and technical solutions you implemented.", "type": "behavioral"},
                 {"question": "How do you validate and ensure the accuracy of your analysis?", "hint": "Discuss quality checks, validation techniques, and peer review processes.", "type": "technical"}
             ]
-    elif 'software' in job_lower or 'developer' in job_lower or 'programming' in job_lower:
+    elif SOFTWARE_ROLE_RE.search(full_job_description):
         if experience_level == 'entry':
             fallback_questions = [
                 {"question": "What programming languages are you most comfortable with?", "hint": "Mention specific languages and any projects or coursework where you used them.", "type": "technical"},